@@ -6,13 +6,14 @@ import os
 import re
 import time
 import ctypes
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from io import BytesIO
-from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
 
 import uiautomation as auto
+from comtypes import COMError
 from PIL import Image
-import win32clipboard as clipboard
 import win32con
 
 kernel32 = ctypes.windll.kernel32
@@ -25,17 +26,76 @@ kernel32.GlobalUnlock.restype = ctypes.c_bool
 kernel32.GlobalFree.argtypes = (ctypes.c_void_p,)
 kernel32.GlobalFree.restype = ctypes.c_void_p
 
-CFSTR_PREFERREDDROPEFFECT = clipboard.RegisterClipboardFormat("Preferred DropEffect")
+user32 = ctypes.windll.user32
+user32.OpenClipboard.argtypes = (ctypes.c_void_p,)
+user32.OpenClipboard.restype = ctypes.c_bool
+user32.CloseClipboard.argtypes = ()
+user32.CloseClipboard.restype = ctypes.c_bool
+user32.EmptyClipboard.argtypes = ()
+user32.EmptyClipboard.restype = ctypes.c_bool
+user32.SetClipboardData.argtypes = (ctypes.c_uint, ctypes.c_void_p)
+user32.SetClipboardData.restype = ctypes.c_void_p
+user32.RegisterClipboardFormatW.argtypes = (ctypes.c_wchar_p,)
+user32.RegisterClipboardFormatW.restype = ctypes.c_uint
+
+CFSTR_PREFERREDDROPEFFECT = user32.RegisterClipboardFormatW("Preferred DropEffect")
 DROPEFFECT_COPY = 1
+# The clipboard takes ownership of every handle it is given, so only the
+# payload can be shared between sends, not the HGLOBAL itself.
+_DROPEFFECT_COPY_PAYLOAD = bytes(ctypes.c_uint32(DROPEFFECT_COPY))
 
 __all__ = ["TeamsClient", "TeamsAutomationError"]
 
-
-_PATTERN_LAST_MSG = re.compile(r"Last message.*", re.IGNORECASE)
-_PATTERN_LEADING = re.compile(r"^(?:Group|Chat)[:\-\u2013\u2014]?\s*", re.IGNORECASE)
-_PATTERN_STATUS = re.compile(r"\b(?:Available|Busy|Away|Offline)\b", re.IGNORECASE)
-_PATTERN_TIME = re.compile(r"\b\d{1,2}:\d{2}\s*(?:AM|PM)?\b.*$", re.IGNORECASE)
+_UIA_CONNECTION_TIMEOUT_MS = 1000
+_UIA_TRANSACTION_TIMEOUT_MS = 3000
+_UIA_E_TIMEOUT = 0x80131505
+_uia_timeouts_configured = False
+
+
+# Strips the "Last message" preview, a leading "Group:"/"Chat:" label,
+# presence keywords and trailing timestamps in a single pass.
+_PATTERN_COMBINED = re.compile(
+    r"Last message.*"
+    r"|^(?:Group|Chat)[:\-\u2013\u2014]?\s*"
+    r"|\b(?:Available|Busy|Away|Offline)\b"
+    r"|\b\d{1,2}:\d{2}\s*(?:AM|PM)?\b.*$",
+    re.IGNORECASE,
+)
 _PATTERN_WHITESPACE = re.compile(r"[\s\u00A0]+")
+# Anything _PATTERN_COMBINED or _PATTERN_WHITESPACE would change; names without
+# a match (e.g. "Favorites", "Columbus Teams Chatbot") skip the cleanup
+# pipeline entirely. "Group"/"Chat" are only stripped as a leading label.
+_NEEDS_NORMALIZE = re.compile(
+    r"[:\d\u00A0\u2013\u2014]|[^\S ]|\s{2}|^\s|\s$"
+    r"|^(?:Group|Chat)|Last message|Available|Busy|Away|Offline",
+    re.IGNORECASE,
+)
+
+
+def _wchar_len(text: str) -> int:
+    """Length of ``text`` in UTF-16 code units, as laid out in a ``wchar_t`` buffer."""
+    if not text or max(text) <= "\uffff":
+        return len(text)
+    return len(text.encode("utf-16le")) // 2
+
+
+def _configure_uia_timeouts() -> None:
+    """Shorten UIA's ~20 s default timeouts once per process so a stalled Teams fails fast.
+
+    The setting lives on uiautomation's shared IUIAutomation object, so it is
+    applied on first use rather than at import or per client.
+    """
+    global _uia_timeouts_configured
+    if _uia_timeouts_configured:
+        return
+    _uia_timeouts_configured = True
+    try:
+        client = auto._AutomationClient.instance()
+        uia2 = client.IUIAutomation.QueryInterface(client.UIAutomationCore.IUIAutomation2)
+        uia2.ConnectionTimeout = _UIA_CONNECTION_TIMEOUT_MS
+        uia2.TransactionTimeout = _UIA_TRANSACTION_TIMEOUT_MS
+    except Exception:  # IUIAutomation2 requires Windows 8+; keep the defaults.
+        pass
 
 
 class _DROPFILES(ctypes.Structure):
@@ -48,6 +108,22 @@ class _DROPFILES(ctypes.Structure):
     ]
 
 
+class _BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", ctypes.c_uint32),
+        ("biWidth", ctypes.c_int32),
+        ("biHeight", ctypes.c_int32),
+        ("biPlanes", ctypes.c_uint16),
+        ("biBitCount", ctypes.c_uint16),
+        ("biCompression", ctypes.c_uint32),
+        ("biSizeImage", ctypes.c_uint32),
+        ("biXPelsPerMeter", ctypes.c_int32),
+        ("biYPelsPerMeter", ctypes.c_int32),
+        ("biClrUsed", ctypes.c_uint32),
+        ("biClrImportant", ctypes.c_uint32),
+    ]
+
+
 class TeamsAutomationError(RuntimeError):
     """Raised when a required Teams UI element cannot be resolved."""
 
@@ -70,8 +146,30 @@ class TeamsClient:
         ".tiff",
         ".webp",
     }
-    _CLIPBOARD_OPEN_RETRIES = 5
-    _CLIPBOARD_RETRY_DELAY = 0.1
+    _IMAGE_EXT_TUPLE = tuple(sorted(_IMAGE_EXTENSIONS))
+    # UIA FindAll cost grows with depth; override via ``search_depths`` once
+    # the shallowest working depth for a Teams build is known.
+    _SEARCH_DEPTHS = {
+        "chat_button": 30,
+        "filter_button": 30,
+        "filter_field": 30,
+        "filter_list": 30,
+        "close_filter": 30,
+        "message_field": 30,
+        "send_button": 30,
+    }
+    _CLIPBOARD_OPEN_RETRIES = 8
+    _CLIPBOARD_RETRY_DELAY = 0.005
+    _CLIPBOARD_MAX_RETRY_DELAY = 0.1
+    _DIB_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    _NAME_CACHE_SIZE = 512
+    _PARALLEL_VALIDATION_THRESHOLD = 4
+    _MAX_VALIDATION_WORKERS = 16
+    _PASTE_TEXT_THRESHOLD = 16
+    _POLL_INTERVAL = 0.05
+    _PASTE_TIMEOUT = 2.0
+    _CHAT_OPEN_DELAY = 1.0
+    _FILTER_CLOSE_TIMEOUT = 0.5
 
     def __init__(
         self,
@@ -83,16 +181,38 @@ class TeamsClient:
         section_preference: Iterable[str] | None = None,
         aliases: Optional[Dict[str, str]] = None,
         minimize_after_send: bool = False,
+        search_depths: Optional[Dict[str, int]] = None,
+        uia_timeouts: bool = True,
     ) -> None:
         self.window_keyword = self._ensure_iterable(window_keyword)
+        self._window_keyword_lc = tuple(keyword.lower() for keyword in self.window_keyword)
         self.window_class_keyword = window_class_keyword
         self.activation_delay = activation_delay
         self.search_timeout = search_timeout
         self.section_preference = tuple(section_preference or self._DEFAULT_SECTION_NAMES)
         self.aliases = aliases or {"Teams Chatbot Bot": "Columbus Teams Chatbot"}
         self._alias_lookup = {key.lower(): value for key, value in self.aliases.items()}
+        self._alias_pattern = self._compile_alias_pattern(self._alias_lookup)
         self.minimize_after_send = minimize_after_send
+        unknown = set(search_depths or ()) - set(self._SEARCH_DEPTHS)
+        if unknown:
+            raise ValueError(f"Unknown search depth keys: {', '.join(sorted(unknown))}")
+        self.search_depths = {**self._SEARCH_DEPTHS, **(search_depths or {})}
+        self.uia_timeouts = uia_timeouts
         self._window: Optional[auto.Control] = None
+        self._control_cache: Dict[Tuple[int, str, str], auto.Control] = {}
+        self._dib_cache: OrderedDict[Tuple[str, float, int], bytes] = OrderedDict()
+        self._dib_cache_bytes = 0
+        self._name_cache: OrderedDict[str, str] = OrderedDict()
+        self._children_query: Optional[Tuple[Any, Any]] = None
+
+    @staticmethod
+    def _compile_alias_pattern(alias_lookup: Dict[str, str]) -> Optional[re.Pattern[str]]:
+        if not alias_lookup:
+            return None
+        # Longest keys first so overlapping aliases prefer the most specific one.
+        keys = sorted(alias_lookup, key=len, reverse=True)
+        return re.compile("|".join(re.escape(key) for key in keys), re.IGNORECASE)
 
     @staticmethod
     def _ensure_iterable(value: str | Iterable[str]) -> Tuple[str, ...]:
@@ -102,24 +222,29 @@ class TeamsClient:
 
     def connect(self) -> auto.Control:
         """Resolve and activate the Teams window."""
-        if self._window and self._window.Exists(0, 0):
-            return self._window
-        root = auto.GetRootControl()
-        target_window = None
-        for candidate in root.GetChildren():
-            if not any(keyword in candidate.Name for keyword in self.window_keyword):
-                continue
-            if self.window_class_keyword and self.window_class_keyword not in candidate.ClassName:
-                continue
-            candidate.SetActive()  # type: ignore[attr-defined]
-            target_window = auto.WindowControl(searchDepth=1, Name=candidate.Name)
-            break
-        if target_window is None or not target_window.Exists(0, 0):
-            raise TeamsAutomationError("Unable to locate an active Microsoft Teams window.")
-        if self.activation_delay:
-            time.sleep(self.activation_delay)
-        self._window = target_window
-        return target_window
+        if self.uia_timeouts:
+            _configure_uia_timeouts()
+        with self._uia_timeouts_as_errors():
+            if self._window and self._window.Exists(0, 0):
+                return self._window
+            root = auto.GetRootControl()
+            target_window = None
+            for candidate in root.GetChildren():
+                name = candidate.Name
+                name_lc = name.lower()
+                if not any(keyword in name_lc for keyword in self._window_keyword_lc):
+                    continue
+                if self.window_class_keyword and self.window_class_keyword not in candidate.ClassName:
+                    continue
+                candidate.SetActive()  # type: ignore[attr-defined]
+                target_window = auto.WindowControl(searchDepth=1, Name=name)
+                break
+            if target_window is None or not target_window.Exists(0, 0):
+                raise TeamsAutomationError("Unable to locate an active Microsoft Teams window.")
+            if self.activation_delay:
+                time.sleep(self.activation_delay)
+            self._window = target_window
+            return target_window
 
     @property
     def window(self) -> auto.Control:
@@ -157,16 +282,18 @@ class TeamsClient:
         wait_after_send: float = 3.0,
     ) -> None:
         """Send a text (and optional image) to a Teams chat."""
-        window = self.window
-        self._activate_chat(window, chat_name, section_name, close_filter)
-        self._enter_message(window, message)
-        if image_path:
-            self._append_image(window, image_path)
-        self._trigger_send(window)
-        if wait_after_send:
-            time.sleep(wait_after_send)
-        if self.minimize_after_send:
-            auto.SendKeys("{win}d")
+        with self._uia_timeouts_as_errors():
+            window = self.window
+            self._activate_chat(window, chat_name, section_name, close_filter)
+            message_field = self._enter_message(window, message)
+            if image_path:
+                self._append_image(window, image_path)
+            sent_value = self._read_value(message_field)
+            self._trigger_send(window)
+            if wait_after_send:
+                self._wait_for_send(message_field, sent_value, wait_after_send)
+            if self.minimize_after_send:
+                auto.SendKeys("{win}d")
 
     def send_files(
         self,
@@ -180,56 +307,125 @@ class TeamsClient:
         wait_after_send: float = 3.0,
     ) -> None:
         """Send one or more files to a Teams chat."""
-        window = self.window
-        self._activate_chat(window, chat_name, section_name, close_filter)
-        resolved_paths = self._validate_files(filepaths)
-        message_field = self._focus_message_field(window)
-        message_field.SendKeys("{Ctrl}a{Del}")
-        if caption:
-            message_field.SendKeys(caption)
-        image_paths: list[str] = []
-        file_paths: list[str] = []
-        for path in resolved_paths:
-            if embed_images and self._is_image(path):
-                image_paths.append(path)
-            else:
-                file_paths.append(path)
-        if image_paths:
-            for image_path in image_paths:
-                self._append_image(window, image_path)
-        if file_paths:
-            self._load_files_to_clipboard(file_paths)
-            message_field.SetFocus()
-            message_field.SendKeys("{Ctrl}v")
-            time.sleep(2.0)
-        self._trigger_send(window)
-        if wait_after_send:
-            time.sleep(wait_after_send)
-        if self.minimize_after_send:
-            auto.SendKeys("{win}d")
+        with self._uia_timeouts_as_errors():
+            window = self.window
+            self._activate_chat(window, chat_name, section_name, close_filter)
+            resolved_paths = self._validate_files(filepaths)
+            message_field = self._focus_message_field(window)
+            self._enter_text(message_field, caption or "")
+            image_paths: list[str] = []
+            file_paths: list[str] = []
+            for path in resolved_paths:
+                if embed_images and self._is_image(path):
+                    image_paths.append(path)
+                else:
+                    file_paths.append(path)
+            if image_paths:
+                for image_path in image_paths:
+                    self._append_image(window, image_path)
+            if file_paths:
+                self._load_files_to_clipboard(file_paths)
+                self._paste_and_wait(message_field)
+            sent_value = self._read_value(message_field)
+            self._trigger_send(window)
+            if wait_after_send:
+                self._wait_for_send(message_field, sent_value, wait_after_send)
+            if self.minimize_after_send:
+                auto.SendKeys("{win}d")
+
+    def _resolve(
+        self,
+        window: auto.Control,
+        kind: str,
+        name: str,
+        target: str,
+    ) -> Optional[auto.Control]:
+        """Return a cached control wrapper, searching the tree only on a miss.
+
+        ``target`` selects the search depth from ``search_depths``.
+        """
+        key = (window.NativeWindowHandle, kind, name)
+        control = self._control_cache.get(key)
+        if control is not None and self._is_alive(control):
+            return control
+        self._control_cache.pop(key, None)
+        candidate = getattr(window, kind)(searchDepth=self.search_depths[target], Name=name)
+        if not candidate.Exists(0, 0):
+            return None
+        # Wrap the resolved element directly so later Exists() checks validate
+        # the element instead of repeating the FindAll walk.
+        control = auto.Control.CreateControlFromElement(candidate.Element)
+        if control is None:
+            return None
+        self._control_cache[key] = control
+        return control
+
+    @staticmethod
+    def _is_alive(control: auto.Control) -> bool:
+        """``Exists(0, 0)`` for cached wrappers, treating a removed element as gone.
+
+        Wrappers built by ``CreateControlFromElement`` only ask UIA for the
+        element's parent, which raises ``COMError`` once the element is removed.
+        """
+        try:
+            return bool(control.Exists(0, 0))
+        except COMError:
+            return False
 
     def _open_chat_hub(self, window: auto.Control) -> None:
-        
-        chat_button = window.Control(searchDepth=30, Name="Chat (Ctrl+2)|聊天 (Ctrl+2)")
-        if not chat_button.Exists(0, 0):
+        chat_button = self._resolve(window, "Control", "Chat (Ctrl+2)|聊天 (Ctrl+2)", "chat_button")
+        if chat_button is None:
             raise TeamsAutomationError("Chat hub button not found.")
         chat_button.Click()
         window.SetActive()  # type: ignore[attr-defined]
 
     def _apply_filter(self, window: auto.Control) -> None:
-        filter_button = window.ButtonControl(searchDepth=30, Name="Show filter text box (Ctrl+Shift+F)|显示筛选器文本框 (Ctrl+Shift+F)")
-        if not filter_button.Exists(0, 0):
+        filter_button = self._resolve(
+            window,
+            "ButtonControl",
+            "Show filter text box (Ctrl+Shift+F)|显示筛选器文本框 (Ctrl+Shift+F)",
+            "filter_button",
+        )
+        if filter_button is None:
             raise TeamsAutomationError("Filter text box trigger not found.")
         filter_button.Click()
 
     def _filter_search(self, window: auto.Control, term: str) -> None:
-        search_field = window.EditControl(searchDepth=30, Name="Filter by name or group name|按姓名或组名筛选")
-        if not search_field.Exists(0, 0):
+        search_field = self._resolve(
+            window, "EditControl", "Filter by name or group name|按姓名或组名筛选", "filter_field"
+        )
+        if search_field is None:
             raise TeamsAutomationError("Filter search field not found.")
+        # The list already shows entries before the term is typed, and partially
+        # applied filters still hold loose matches, so only stop once an entry
+        # equals the target or the list has changed and then held still.
+        before = self._entry_names(window)
+        target = self._normalize_name(term).lower()
+        previous: list[Optional[Tuple[str, ...]]] = [None]
+
+        def settled() -> bool:
+            names = self._entry_names(window)
+            if names is None:
+                return False
+            if target and any(
+                self._normalize_entry_name(name).lower() == target for name in names
+            ):
+                return True
+            stable = names != before and names == previous[0]
+            previous[0] = names
+            return stable
+
         search_field.SetFocus()
         search_field.SendKeys("{Ctrl}a{Del}")
         search_field.SendKeys(term)
-        time.sleep(self.search_timeout)
+        self._wait_until(settled, self.search_timeout)
+
+    def _entry_names(self, window: auto.Control) -> Optional[Tuple[str, ...]]:
+        try:
+            sections = self._collect_sections(window)
+            return tuple(name for _, _, name in self._iter_section_entries(sections, sections))
+        except (TeamsAutomationError, COMError):
+            return None
 
     def _find_chat_entry(
         self,
@@ -239,70 +435,132 @@ class TeamsClient:
     ) -> auto.Control:
         normalized_target = self._normalize_name(display_name)
         sections = self._collect_sections(window)
-        ordered_sections: Tuple[str, ...]
-        if section_name:
-            if section_name not in sections:
-                available = ", ".join(sorted(sections))
-                raise TeamsAutomationError(
-                    f"Section '{section_name}' not available. Found: {available}"
-                )
-            ordered_sections = (section_name,) + tuple(
-                key for key in sections if key != section_name
+        if section_name and section_name not in sections:
+            available = ", ".join(sorted(sections))
+            raise TeamsAutomationError(
+                f"Section '{section_name}' not available. Found: {available}"
             )
-        else:
-            ordered_sections = tuple(
-                key for key in self.section_preference if key in sections
-            ) + tuple(key for key in sections if key not in self.section_preference)
 
+        # An exact (case-insensitive) name wins over a looser substring match
+        # anywhere in the list, so "Bob Smith Team" never resolves to "Bob Smith".
+        target_lc = normalized_target.lower()
+        loose_match: Any = None
         inspected: list[str] = []
-        for current_section in ordered_sections:
-            candidates = sections.get(current_section, ())
-            for candidate in candidates:
-                friendly_name = self._normalize_name(candidate.Name)
-                if self._names_match(friendly_name, normalized_target):
-                    return candidate
-                inspected.append(f"{current_section}:{friendly_name}")
+        for current_section, candidate, candidate_name in self._iter_section_entries(
+            sections, self._ordered_sections(sections, section_name)
+        ):
+            friendly_name = self._normalize_entry_name(candidate_name)
+            if friendly_name and friendly_name.lower() == target_lc:
+                control = auto.Control.CreateControlFromElement(candidate)
+                if control is not None:
+                    return control
+            elif loose_match is None and self._names_match(friendly_name, normalized_target):
+                loose_match = candidate
+            inspected.append(f"{current_section}:{friendly_name}")
+        if loose_match is not None:
+            control = auto.Control.CreateControlFromElement(loose_match)
+            if control is not None:
+                return control
         inspected_text = ", ".join(inspected) or "<none>"
         raise TeamsAutomationError(
             f"Chat '{display_name}' not located. Inspected entries: {inspected_text}"
         )
 
-    def _collect_sections(self, window: auto.Control) -> Dict[str, Tuple[auto.Control, ...]]:
-        container = window.Control(searchDepth=30, Name="Filter active|筛选器处于活动状态")
-        if not container.Exists(0, 0):
+    def _ordered_sections(
+        self,
+        sections: Dict[str, Any],
+        section_name: Optional[str],
+    ) -> Iterator[str]:
+        """Yield section names: the requested one (or preferred ones) first."""
+        if section_name:
+            yield section_name
+            for key in sections:
+                if key != section_name:
+                    yield key
+            return
+        seen = set()
+        for key in self.section_preference:
+            if key in sections and key not in seen:
+                seen.add(key)
+                yield key
+        for key in sections:
+            if key not in seen:
+                yield key
+
+    def _collect_sections(self, window: auto.Control) -> Dict[str, Any]:
+        container = self._resolve(window, "Control", "Filter active|筛选器处于活动状态", "filter_list")
+        if container is None:
             raise TeamsAutomationError("Active filter list not found.")
-        sections: Dict[str, Tuple[auto.Control, ...]] = {}
-        for section in container.GetChildren():
-            if not section.Name:
-                continue
-            entries = []
-            for group in section.GetChildren():
-                for entry in group.GetChildren():
-                    if not entry.Name:
-                        continue
-                    entries.append(entry)
-            if entries:
-                sections[section.Name] = tuple(entries)
+        sections: Dict[str, Any] = {}
+        for section_label, section in self._named_children(container.Element):
+            if section_label:
+                sections[section_label] = section
         return sections
 
+    def _iter_section_entries(
+        self,
+        sections: Dict[str, Any],
+        ordered_section_names: Iterable[str],
+    ) -> Iterator[Tuple[str, Any, str]]:
+        """Lazily yield ``(section, entry, entry_name)`` in the given section order.
+
+        Section children are only enumerated when the caller reaches them, so a
+        match in the first section never touches the others. Entries are raw
+        UIA elements; wrap the chosen one with ``CreateControlFromElement``.
+        """
+        for section_label in ordered_section_names:
+            section = sections.get(section_label)
+            if section is None:
+                continue
+            for _, group in self._named_children(section):
+                for entry_name, entry in self._named_children(group):
+                    if entry_name:
+                        yield section_label, entry, entry_name
+
+    def _named_children(self, element: Any) -> Iterator[Tuple[str, Any]]:
+        """Yield ``(name, element)`` for each child of a raw UIA element.
+
+        Uses ``FindAllBuildCache`` so every child's Name arrives in the same
+        cross-process call as the children themselves.
+        """
+        if self._children_query is None:
+            uia = auto._AutomationClient.instance().IUIAutomation
+            request = uia.CreateCacheRequest()
+            request.AddProperty(auto.PropertyId.NamePropertyId)
+            self._children_query = (uia.CreateTrueCondition(), request)
+        condition, request = self._children_query
+        children = element.FindAllBuildCache(auto.TreeScope.Children, condition, request)
+        if not children:
+            return
+        for index in range(children.Length):
+            child = children.GetElement(index)
+            yield child.CachedName or "", child
+
     def _close_filter(self, window: auto.Control) -> None:
-        close_button = window.ButtonControl(searchDepth=30, Name="Close filter text box|关闭筛选器文本框")
-        if close_button.Exists(0, 0):
+        close_button = self._resolve(
+            window, "ButtonControl", "Close filter text box|关闭筛选器文本框", "close_filter"
+        )
+        if close_button is not None:
             close_button.Click()
-            time.sleep(0.5)
+            self._wait_until(lambda: not self._is_alive(close_button), self._FILTER_CLOSE_TIMEOUT)
 
-    def _focus_message_field(self, window: auto.Control) -> auto.Control:
+    def _find_message_field(self, window: auto.Control) -> Optional[auto.Control]:
         for field_name in self._MESSAGE_FIELD_NAMES:
-            candidate = window.EditControl(searchDepth=30, Name=field_name)
-            if candidate.Exists(0, 0):
-                candidate.SetFocus()
+            candidate = self._resolve(window, "EditControl", field_name, "message_field")
+            if candidate is not None:
                 return candidate
-        raise TeamsAutomationError("Message input field not found.")
+        return None
+
+    def _focus_message_field(self, window: auto.Control) -> auto.Control:
+        candidate = self._find_message_field(window)
+        if candidate is None:
+            raise TeamsAutomationError("Message input field not found.")
+        candidate.SetFocus()
+        return candidate
 
     def _enter_message(self, window: auto.Control, message: str) -> auto.Control:
         message_field = self._focus_message_field(window)
-        message_field.SendKeys("{Ctrl}a{Del}")
-        message_field.SendKeys(message)
+        self._enter_text(message_field, message)
         return message_field
 
     def _append_image(self, window: auto.Control, image_path: str) -> None:
@@ -311,36 +569,131 @@ class TeamsClient:
             raise TeamsAutomationError(f"Image path not found: {resolved_path}")
         self._load_image_to_clipboard(resolved_path)
         message_field = self._focus_message_field(window)
-        message_field.SetFocus()
-        message_field.SendKeys("{Ctrl}v")
-        time.sleep(2.0)
+        self._paste_and_wait(message_field)
+
+    def _enter_text(self, field: auto.Control, text: str) -> None:
+        """Replace the contents of ``field`` with ``text``.
+
+        Long text is pasted in one go, which replaces the clipboard contents.
+        Text containing ``{`` is always typed so SendKeys key codes such as
+        ``{Enter}`` behave the same whatever the message length.
+        """
+        if len(text) > self._PASTE_TEXT_THRESHOLD and "{" not in text:
+            self._load_text_to_clipboard(text)
+            self._paste_and_wait(field, "{Ctrl}a{Del}{Ctrl}v", expected=text)
+            return
+        field.SendKeys("{Ctrl}a{Del}")
+        if text:
+            field.SendKeys(text)
+
+    def _paste_and_wait(
+        self,
+        field: auto.Control,
+        keys: str = "{Ctrl}v",
+        expected: Optional[str] = None,
+    ) -> None:
+        """Send ``keys`` and wait for the field to show ``expected`` (or any change)."""
+        before = self._read_value(field)
+        field.SendKeys(keys)
+        if before is None:
+            time.sleep(self._PASTE_TIMEOUT)
+            return
+        if expected is None:
+            self._wait_until(lambda: self._read_value(field) != before, self._PASTE_TIMEOUT)
+        else:
+            self._wait_until(
+                lambda: self._text_matches(self._read_value(field), expected), self._PASTE_TIMEOUT
+            )
+
+    @staticmethod
+    def _text_matches(value: Optional[str], expected: str) -> bool:
+        if value is None:
+            return False
+        return value.replace("\r\n", "\n").strip() == expected.replace("\r\n", "\n").strip()
+
+    def _wait_for_send(
+        self,
+        message_field: auto.Control,
+        sent_value: Optional[str],
+        timeout: float,
+    ) -> None:
+        """Wait for the message box to clear after sending ``sent_value``.
+
+        Attachments do not show up in the ValuePattern, so when the box was
+        already empty (or unreadable) before sending, sleep the full ``timeout``.
+        """
+        if not sent_value:
+            time.sleep(timeout)
+            return
+        self._wait_until(lambda: self._read_value(message_field) == "", timeout)
 
     def _trigger_send(self, window: auto.Control) -> None:
         send_button = None
         for button_name in self._SEND_BUTTON_NAMES:
-            candidate = window.ButtonControl(searchDepth=30, Name=button_name)
-            if candidate.Exists(0, 0):
+            candidate = self._resolve(window, "ButtonControl", button_name, "send_button")
+            if candidate is not None:
                 send_button = candidate
                 break
         if send_button is None:
             raise TeamsAutomationError("Send button not found.")
         send_button.Click()
 
+    def _load_text_to_clipboard(self, text: str) -> None:
+        handle = self._alloc_global(text.encode("utf-16le") + b"\x00\x00", "text")
+        self._set_clipboard_data((win32con.CF_UNICODETEXT, handle))
+
     def _load_image_to_clipboard(self, path: str) -> None:
+        stat = os.stat(path)
+        key = (path, stat.st_mtime, stat.st_size)
+        bmp_data = self._dib_cache.get(key)
+        if bmp_data is None:
+            bmp_data = self._encode_dib(path)
+            self._cache_dib(key, bmp_data)
+        else:
+            self._dib_cache.move_to_end(key)
+        handle = self._alloc_global(bmp_data, "image")
+        self._set_clipboard_data((win32con.CF_DIB, handle))
+
+    def _cache_dib(self, key: Tuple[str, float, int], bmp_data: bytes) -> None:
+        """Store an encoded image, evicting the oldest until under the byte cap."""
+        # Uncompressed DIBs are large (a 4K screenshot is ~25 MB), so the cap is
+        # on total payload size; anything bigger than the cap is not kept.
+        if len(bmp_data) > self._DIB_CACHE_MAX_BYTES:
+            return
+        self._dib_cache[key] = bmp_data
+        self._dib_cache_bytes += len(bmp_data)
+        while self._dib_cache_bytes > self._DIB_CACHE_MAX_BYTES:
+            _, evicted = self._dib_cache.popitem(last=False)
+            self._dib_cache_bytes -= len(evicted)
+
+    @staticmethod
+    def _encode_dib(path: str) -> bytes:
+        """Encode an image as a 24-bit bottom-up CF_DIB payload."""
         with Image.open(path) as img:
-            with BytesIO() as output:
-                img.convert("RGB").save(output, format="BMP")
-                bmp_data = output.getvalue()[14:]
-        with self._clipboard_session():
-            clipboard.EmptyClipboard()
-            clipboard.SetClipboardData(win32con.CF_DIB, bmp_data)
+            rgb = img.convert("RGB")
+        width, height = rgb.size
+        stride = (width * 3 + 3) & ~3
+        header = _BITMAPINFOHEADER(
+            biSize=ctypes.sizeof(_BITMAPINFOHEADER),
+            biWidth=width,
+            biHeight=height,
+            biPlanes=1,
+            biBitCount=24,
+            biCompression=0,  # BI_RGB
+            biSizeImage=stride * height,
+        )
+        # The raw encoder pads rows to ``stride`` and emits them bottom-up
+        # (orientation -1), which is exactly the DIB pixel layout.
+        return bytes(header) + rgb.tobytes("raw", "BGR", stride, -1)
 
     def _load_files_to_clipboard(self, paths: Sequence[str]) -> None:
         if not paths:
             raise TeamsAutomationError("No file paths provided.")
-        file_str = "\0".join(paths) + "\0\0"
-        file_bytes = file_str.encode("utf-16le")
-        total_size = ctypes.sizeof(_DROPFILES) + len(file_bytes)
+        wchar_size = ctypes.sizeof(ctypes.c_wchar)
+        lengths = [_wchar_len(path) for path in paths]
+        # Each path plus its NUL terminator, followed by the list's final NUL.
+        total_chars = sum(lengths) + len(paths) + 1
+        total_size = ctypes.sizeof(_DROPFILES) + total_chars * wchar_size
         handle = kernel32.GlobalAlloc(win32con.GHND, total_size)
         if not handle:
             raise TeamsAutomationError("Failed to allocate clipboard memory for files.")
@@ -355,53 +708,83 @@ class TeamsClient:
             drop.x = drop.y = 0
             drop.fNC = 0
             drop.fWide = 1
-            ctypes.memmove(ptr_value + ctypes.sizeof(_DROPFILES), file_bytes, len(file_bytes))
+            # GHND memory is zero-filled, so the NUL terminators are already in
+            # place; ctypes hands each str to memmove as a wchar_t buffer.
+            offset = ptr_value + ctypes.sizeof(_DROPFILES)
+            for path, length in zip(paths, lengths):
+                ctypes.memmove(offset, path, length * wchar_size)
+                offset += (length + 1) * wchar_size
         finally:
             kernel32.GlobalUnlock(handle)
-        drop_effect_handle = kernel32.GlobalAlloc(
-            win32con.GHND, ctypes.sizeof(ctypes.c_uint32)
-        )
-        if not drop_effect_handle:
+        try:
+            drop_effect_handle = self._alloc_global(_DROPEFFECT_COPY_PAYLOAD, "drop effect")
+        except TeamsAutomationError:
             kernel32.GlobalFree(handle)
-            raise TeamsAutomationError("Failed to allocate clipboard memory for drop effect.")
-        effect_ptr = kernel32.GlobalLock(drop_effect_handle)
-        effect_ptr_value = int(effect_ptr) if effect_ptr else 0
-        if not effect_ptr_value:
-            kernel32.GlobalFree(drop_effect_handle)
+            raise
+        self._set_clipboard_data(
+            (win32con.CF_HDROP, handle),
+            (CFSTR_PREFERREDDROPEFFECT, drop_effect_handle),
+        )
+
+    @staticmethod
+    def _alloc_global(data: bytes, label: str) -> int:
+        """Copy ``data`` into a movable global memory block for the clipboard."""
+        handle = kernel32.GlobalAlloc(win32con.GHND, len(data))
+        if not handle:
+            raise TeamsAutomationError(f"Failed to allocate clipboard memory for {label}.")
+        ptr = kernel32.GlobalLock(handle)
+        if not ptr:
             kernel32.GlobalFree(handle)
-            raise TeamsAutomationError("Failed to lock clipboard memory for drop effect.")
+            raise TeamsAutomationError(f"Failed to lock clipboard memory for {label}.")
         try:
-            ctypes.c_uint32.from_address(effect_ptr_value).value = DROPEFFECT_COPY
+            ctypes.memmove(ptr, data, len(data))
         finally:
-            kernel32.GlobalUnlock(drop_effect_handle)
-        drop_handle_owned = True
-        effect_handle_owned = True
+            kernel32.GlobalUnlock(handle)
+        return handle
+
+    def _set_clipboard_data(self, *items: Tuple[int, int]) -> None:
+        """Replace the clipboard contents with ``(format, handle)`` pairs.
+
+        Ownership of each handle passes to the clipboard once it is set; any
+        handle that was not handed over is freed here.
+        """
+        pending = list(items)
         try:
             with self._clipboard_session():
-                clipboard.EmptyClipboard()
-                clipboard.SetClipboardData(win32con.CF_HDROP, int(handle))
-                drop_handle_owned = False
-                clipboard.SetClipboardData(CFSTR_PREFERREDDROPEFFECT, int(drop_effect_handle))
-                effect_handle_owned = False
+                if not user32.EmptyClipboard():
+                    raise TeamsAutomationError("Unable to empty the clipboard.")
+                while pending:
+                    clipboard_format, handle = pending[0]
+                    if not user32.SetClipboardData(clipboard_format, handle):
+                        raise TeamsAutomationError("Failed to place data on the clipboard.")
+                    pending.pop(0)
         finally:
-            if drop_handle_owned:
+            for _, handle in pending:
                 kernel32.GlobalFree(handle)
-            if effect_handle_owned:
-                kernel32.GlobalFree(drop_effect_handle)
 
     def _normalize_name(self, raw_name: str) -> str:
         name = raw_name or ""
-        name = _PATTERN_LAST_MSG.sub("", name)
-        name = _PATTERN_LEADING.sub("", name)
-        name = _PATTERN_TIME.sub("", name)
-        name = _PATTERN_STATUS.sub("", name)
-        name = _PATTERN_WHITESPACE.sub(" ", name).strip()
-        lower_name = name.lower()
-        for alias_key, alias_value in self._alias_lookup.items():
-            if lower_name == alias_key or alias_key in lower_name:
-                return alias_value
+        if _NEEDS_NORMALIZE.search(name):
+            name = _PATTERN_COMBINED.sub("", name)
+            name = _PATTERN_WHITESPACE.sub(" ", name).strip()
+        if self._alias_pattern is not None:
+            match = self._alias_pattern.search(name)
+            if match:
+                return self._alias_lookup.get(match.group(0).lower(), name)
         return name
 
+    def _normalize_entry_name(self, raw_name: str) -> str:
+        """Memoized ``_normalize_name`` for chat list entries."""
+        friendly_name = self._name_cache.get(raw_name)
+        if friendly_name is None:
+            friendly_name = self._normalize_name(raw_name)
+            self._name_cache[raw_name] = friendly_name
+            if len(self._name_cache) > self._NAME_CACHE_SIZE:
+                self._name_cache.popitem(last=False)
+        else:
+            self._name_cache.move_to_end(raw_name)
+        return friendly_name
+
     def _names_match(self, candidate: str, target: str) -> bool:
         if not candidate or not target:
             return False
@@ -415,8 +798,7 @@ class TeamsClient:
 
     @classmethod
     def _is_image(cls, path: str) -> bool:
-        _, ext = os.path.splitext(path)
-        return ext.lower() in cls._IMAGE_EXTENSIONS
+        return path.lower().endswith(cls._IMAGE_EXT_TUPLE)
 
     def _activate_chat(
         self,
@@ -430,34 +812,107 @@ class TeamsClient:
         self._filter_search(window, chat_name)
         target_control = self._find_chat_entry(window, chat_name, section_name)
         target_control.Click()
-        time.sleep(1.0)
+        # The previous chat's message box is still present at this point, so
+        # wait for the clicked entry itself to report the selection; never
+        # longer than the fixed delay used when selection cannot be read.
+        if self._is_selected(target_control) is None:
+            time.sleep(self._CHAT_OPEN_DELAY)
+        else:
+            self._wait_until(lambda: self._is_selected(target_control), self._CHAT_OPEN_DELAY)
+        self._forget_conversation_controls(window)
         if close_filter:
             self._close_filter(window)
 
-    def _validate_files(self, filepaths: Sequence[str]) -> Tuple[str, ...]:
-        resolved: list[str] = []
-        for path in filepaths:
-            resolved_path = os.path.realpath(path)
-            if not os.path.exists(resolved_path):
-                raise TeamsAutomationError(f"File path not found: {resolved_path}")
-            if not os.path.isfile(resolved_path):
-                raise TeamsAutomationError(f"Path is not a file: {resolved_path}")
-            resolved.append(resolved_path)
-        return tuple(resolved)
+    def _forget_conversation_controls(self, window: auto.Control) -> None:
+        """Drop cached compose-box controls, which belong to the previous chat.
+
+        A cached wrapper only proves the element is still in the tree, not that
+        it is part of the chat just opened.
+        """
+        handle = window.NativeWindowHandle
+        for field_name in self._MESSAGE_FIELD_NAMES:
+            self._control_cache.pop((handle, "EditControl", field_name), None)
+        for button_name in self._SEND_BUTTON_NAMES:
+            self._control_cache.pop((handle, "ButtonControl", button_name), None)
+
+    def _validate_files(self, filepaths: Iterable[str]) -> Tuple[str, ...]:
+        filepaths = tuple(filepaths)
+        if len(filepaths) < self._PARALLEL_VALIDATION_THRESHOLD:
+            return tuple(self._validate_one(path) for path in filepaths)
+        # Each check is a blocking stat round-trip (slow on network shares), so
+        # larger batches run concurrently; map() keeps input order and raises
+        # the first failure in that order.
+        workers = min(self._MAX_VALIDATION_WORKERS, len(filepaths))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return tuple(executor.map(self._validate_one, filepaths))
+
+    @staticmethod
+    def _validate_one(path: str) -> str:
+        resolved_path = os.path.realpath(path)
+        if not os.path.exists(resolved_path):
+            raise TeamsAutomationError(f"File path not found: {resolved_path}")
+        if not os.path.isfile(resolved_path):
+            raise TeamsAutomationError(f"Path is not a file: {resolved_path}")
+        return resolved_path
+
+    def _wait_until(
+        self,
+        predicate: Callable[[], object],
+        timeout: float,
+        interval: Optional[float] = None,
+    ) -> bool:
+        """Poll ``predicate`` until it is truthy or ``timeout`` seconds elapse."""
+        interval = self._POLL_INTERVAL if interval is None else interval
+        deadline = time.monotonic() + timeout
+        while True:
+            if predicate():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+    @staticmethod
+    def _read_value(control: auto.Control) -> Optional[str]:
+        """Current ValuePattern text, or ``None`` when it cannot be read."""
+        try:
+            return control.GetValuePattern().Value or ""
+        except Exception:
+            return None
+
+    @staticmethod
+    def _is_selected(control: auto.Control) -> Optional[bool]:
+        """SelectionItemPattern state, or ``None`` when it cannot be read."""
+        try:
+            return bool(control.GetSelectionItemPattern().IsSelected)
+        except Exception:
+            return None
+
+    @contextmanager
+    def _uia_timeouts_as_errors(self) -> Iterator[None]:
+        """Surface UIA timeouts (UIA_E_TIMEOUT) as ``TeamsAutomationError``."""
+        try:
+            yield
+        except COMError as exc:
+            if (exc.hresult & 0xFFFFFFFF) == _UIA_E_TIMEOUT:
+                raise TeamsAutomationError(
+                    "Microsoft Teams did not respond to UI Automation in time."
+                ) from exc
+            raise
 
     @contextmanager
     def _clipboard_session(self) -> Iterator[None]:
         last_error: Optional[Exception] = None
-        for _ in range(self._CLIPBOARD_OPEN_RETRIES):
-            try:
-                clipboard.OpenClipboard()
+        delay = self._CLIPBOARD_RETRY_DELAY
+        for attempt in range(self._CLIPBOARD_OPEN_RETRIES):
+            if user32.OpenClipboard(None):
                 break
-            except OSError as exc:
-                last_error = exc
-                time.sleep(self._CLIPBOARD_RETRY_DELAY)
+            last_error = ctypes.WinError()
+            if attempt + 1 < self._CLIPBOARD_OPEN_RETRIES:
+                time.sleep(delay)
+                delay = min(delay * 2, self._CLIPBOARD_MAX_RETRY_DELAY)
         else:
             raise TeamsAutomationError("Unable to access clipboard; it may be locked by another process.") from last_error
         try:
             yield
         finally:
-            clipboard.CloseClipboard()
+            user32.CloseClipboard()